@@ -0,0 +1,105 @@
+"""Lightweight argparse command-line interface for the file encoder package.
+
+This is the ``encode`` console script. It avoids importing click so one-shot
+invocations start quickly; ``file_encoder.cli.main`` remains available as a
+click command for existing callers.
+"""
+
+import argparse
+import os
+import sys
+from typing import Callable, List, Optional
+
+from .encoder import FileEncoder
+
+
+def _echo(message: str, err: bool = False) -> None:
+    """Print a message to stdout, or to stderr if err is set."""
+    print(message, file=sys.stderr if err else sys.stdout)
+
+
+def run(file_path: str, encoding: str, output: Optional[str], verbose: bool,
+        echo: Callable[..., None] = _echo) -> int:
+    """
+    Encode a file and report the result.
+
+    Args:
+        file_path: Path to the file to encode
+        encoding: Target encoding
+        output: Output file path (optional)
+        verbose: Whether to print verbose output
+        echo: Function used to print messages, called as echo(message, err=...)
+
+    Returns:
+        Process exit code
+    """
+    try:
+        encoder = FileEncoder()
+
+        if verbose:
+            echo(f"Input file: {file_path}")
+            echo(f"Target encoding: {encoding}")
+            if output:
+                echo(f"Output file: {output}")
+
+        # Encode the file
+        result_path = encoder.encode_file(
+            input_path=file_path,
+            output_path=output,
+            encoding=encoding
+        )
+
+        if verbose:
+            original_encoding = encoder.get_file_encoding(file_path)
+            echo(f"Original encoding detected: {original_encoding}")
+
+        echo(f"File encoded successfully: {result_path}")
+
+    except FileNotFoundError as e:
+        echo(f"Error: {e}", err=True)
+        return 1
+    except ValueError as e:
+        echo(f"Error: {e}", err=True)
+        return 1
+    except UnicodeDecodeError as e:
+        echo(f"Error: Could not decode input file - {e}", err=True)
+        return 1
+    except UnicodeEncodeError as e:
+        echo(f"Error: Could not encode to {encoding} - {e}", err=True)
+        return 1
+    except Exception as e:
+        echo(f"Unexpected error: {e}", err=True)
+        return 1
+
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Encode a file with the specified character encoding.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='encode',
+        description='Encode a file with the specified character encoding.'
+    )
+    parser.add_argument('file_path', help='Path to the file to encode')
+    parser.add_argument('--encoding', '-e', default=FileEncoder.DEFAULT_ENCODING,
+                        help=f'Target encoding (default: {FileEncoder.DEFAULT_ENCODING})')
+    parser.add_argument('--output', '-o', help='Output file path (optional)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.file_path):
+        parser.error(f"Path '{args.file_path}' does not exist.")
+
+    return run(args.file_path, args.encoding, args.output, args.verbose)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
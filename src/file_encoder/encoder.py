@@ -1,22 +1,121 @@
 """Core encoding functionality for the file encoder package."""
 
+import codecs
+import errno
+import importlib
+import mmap
 import os
-from pathlib import Path
-from typing import Optional
+import re
+import shutil
+import stat as stat_module
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+# Optional detector modules, imported on first use so that importing this
+# module stays cheap. None means not yet imported, False means not installed.
+_cchardet: Any = None
+_chardet: Any = None
+
+
+def _get_cchardet() -> Any:
+    """Return the cchardet module, or False if it is not installed."""
+    global _cchardet
+    if _cchardet is None:
+        try:
+            _cchardet = importlib.import_module('cchardet')
+        except ImportError:  # cchardet is an optional dependency
+            _cchardet = False
+    return _cchardet
+
+
+def _get_chardet() -> Any:
+    """Return the chardet module, or False if it is not installed."""
+    global _chardet
+    if _chardet is None:
+        try:
+            _chardet = importlib.import_module('chardet')
+        except ImportError:  # chardet is an optional dependency
+            _chardet = False
+    return _chardet
+
+
+# Byte order marks and the encodings they identify. UTF-32 marks must be
+# checked before UTF-16 since the UTF-32-LE mark starts with the UTF-16-LE one.
+_BOMS = (
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe\x00\x00', 'utf-32-le'),
+    (b'\x00\x00\xfe\xff', 'utf-32-be'),
+    (b'\xff\xfe', 'utf-16-le'),
+    (b'\xfe\xff', 'utf-16-be'),
+)
+
+# Chunk size and upper bound on the sample fed to the encoding detector
+_DETECT_CHUNK_SIZE = 8 * 1024
+_DETECT_SAMPLE_LIMIT = 64 * 1024
+
+# Minimum confidence for a detector verdict to be accepted, per backend.
+# chardet 7 reports correct verdicts at very low confidence (often below
+# 0.1), so none of its verdicts are discarded; cchardet's scores are higher
+# and a low one is a real sign of doubt.
+_CCHARDET_MIN_CONFIDENCE = 0.5
+_CHARDET_MIN_CONFIDENCE = 0.0
+
+# Matches any byte outside the 7-bit ASCII range
+_NON_ASCII = re.compile(rb'[\x80-\xff]')
+
+# Number of bytes read per iteration when transcoding a file
+_TRANSCODE_CHUNK_SIZE = 64 * 1024
+
+# Buffer size for file objects opened while encoding
+_IO_BUFFER_SIZE = 1 << 20
+
+# Key of the encoding cache: path, size, inode, change time, modification
+# time and whether detection was deep
+_CacheKey = Tuple[str, int, int, int, int, bool]
 
 
 class FileEncoder:
     """A class for encoding files with various character encodings."""
     
     DEFAULT_ENCODING = "utf-8"
-    SUPPORTED_ENCODINGS = [
+    SUPPORTED_ENCODINGS: FrozenSet[str] = frozenset({
         "utf-8", "utf-16", "utf-32", "ascii", "latin-1", "cp1252",
         "iso-8859-1", "windows-1252", "big5", "gb2312", "shift_jis"
-    ]
+    })
+    # Stable ordering of SUPPORTED_ENCODINGS for error messages
+    _SUPPORTED_ENCODINGS_SORTED: Tuple[str, ...] = tuple(sorted(SUPPORTED_ENCODINGS))
+    # Canonical codec names of SUPPORTED_ENCODINGS, so aliases such as
+    # "UTF8" or "utf_8" are accepted
+    _SUPPORTED_CANONICAL: FrozenSet[str] = frozenset(
+        codecs.lookup(name).name for name in SUPPORTED_ENCODINGS
+    )
+    # Supersets of supported encodings that detectors report for files in
+    # them, e.g. GB18030 for GB2312 files (cchardet) and CP932 for Shift-JIS
+    # files (chardet)
+    _SUPERSET_ENCODINGS: Tuple[str, ...] = ("gb18030", "gbk", "cp932", "cp950", "big5hkscs")
+    # Canonical names of source encodings encode_file will stream from: the
+    # supported encodings, their supersets and the BOM variants. Any other
+    # detector verdict goes through the fallback decoding instead.
+    _TRANSCODABLE_CANONICAL: FrozenSet[str] = _SUPPORTED_CANONICAL | frozenset(
+        codecs.lookup(name).name
+        for name in _SUPERSET_ENCODINGS + tuple(name for _, name in _BOMS)
+    )
     
     def __init__(self):
         """Initialize the FileEncoder."""
-        pass
+        # Detected encodings keyed by path, file identity and deep
+        self._encoding_cache: Dict[_CacheKey, str] = {}
     
     def encode_file(self, input_path: str, output_path: Optional[str] = None, 
                    encoding: str = DEFAULT_ENCODING) -> str:
@@ -37,26 +136,293 @@ class FileEncoder:
             UnicodeDecodeError: If file cannot be decoded
             UnicodeEncodeError: If file cannot be encoded
         """
-        if not os.path.exists(input_path):
-            raise FileNotFoundError(f"Input file not found: {input_path}")
+        # The input is opened once and the descriptor shared by detection,
+        # copying and transcoding
+        fd, stat = self._open_for_read(input_path)
+        try:
+            target_encoding = self._canonical_encoding(encoding)
+            
+            # Generate output path if not provided
+            if output_path is None:
+                root, ext = os.path.splitext(os.fspath(input_path))
+                output_path = f"{root}_{encoding}{ext}"
+            
+            source_encoding = self._get_cached_encoding(input_path, fd, stat)
+            
+            # Encoding in place cannot stream, since opening the output truncates the input
+            try:
+                output_stat = os.stat(output_path)
+            except FileNotFoundError:
+                output_stat = None
+            if output_stat is not None and os.path.samestat(stat, output_stat):
+                self._encode_in_memory(fd, stat, input_path, output_path, target_encoding,
+                                       source_encoding)
+                return output_path
+            
+            # Single-byte codecs never fail to decode, so a wrong detector
+            # verdict would silently garble the output. Only trust verdicts
+            # for encodings this class already handles.
+            if not self._is_transcodable(source_encoding):
+                self._encode_in_memory(fd, stat, input_path, output_path, target_encoding)
+                return output_path
+            
+            # When the bytes are already valid in the target encoding, copy them as-is
+            if self._can_copy_bytes(source_encoding, target_encoding):
+                self._copy_bytes(fd, stat.st_size, output_path)
+                return output_path
+            
+            try:
+                self._transcode(fd, output_path, source_encoding, target_encoding)
+            except (LookupError, UnicodeDecodeError):
+                # Detection picked an encoding that cannot decode the whole file,
+                # so fall back to reading it in memory with each candidate encoding
+                self._encode_in_memory(fd, stat, input_path, output_path, target_encoding)
+        finally:
+            os.close(fd)
+        
+        return output_path
+    
+    @classmethod
+    def encode_files(cls, paths: Iterable[str], encoding: str = DEFAULT_ENCODING,
+                     workers: Optional[int] = None) -> List[str]:
+        """
+        Encode several files in parallel, each to its default output path.
+        
+        Files are distributed across a process pool, so transcoding is not
+        serialized by the GIL.
+        
+        Args:
+            paths: Paths to the input files
+            encoding: Target encoding (defaults to utf-8)
+            workers: Number of worker processes (defaults to the CPU count)
+            
+        Returns:
+            Paths to the encoded output files, in the same order as paths
+            
+        Raises:
+            FileNotFoundError: If an input file doesn't exist
+            ValueError: If encoding is not supported
+            UnicodeDecodeError: If a file cannot be decoded
+            UnicodeEncodeError: If a file cannot be encoded
+        """
+        paths = list(paths)
+        
+        # A pool is not worth starting for a single file or a single worker
+        if len(paths) < 2 or workers == 1:
+            encoder = cls()
+            return [encoder.encode_file(path, encoding=encoding) for path in paths]
+        
+        # Imported here since process pools are only needed for batch encoding
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            return list(executor.map(_encode_one, [cls] * len(paths), paths,
+                                     [encoding] * len(paths)))
+    
+    def _open_for_read(self, file_path: str) -> Tuple[int, os.stat_result]:
+        """
+        Open a file for reading at the OS level.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Tuple of the open file descriptor and its stat result. The caller
+            is responsible for closing the descriptor.
+            
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            IsADirectoryError: If the path is a directory
+            OSError: If the path is not a regular file
+        """
+        try:
+            fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Input file not found: {file_path}") from None
+        
+        try:
+            stat = os.fstat(fd)
+            # os.open succeeds on directories, which cannot be read or mapped
+            if stat_module.S_ISDIR(stat.st_mode):
+                raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), file_path)
+            if not stat_module.S_ISREG(stat.st_mode):
+                raise OSError(errno.EINVAL, "Not a regular file", file_path)
+        except OSError:
+            os.close(fd)
+            raise
+        return fd, stat
+    
+    def _canonical_encoding(self, encoding: str) -> str:
+        """
+        Resolve an encoding name to its canonical codec name.
         
-        if encoding not in self.SUPPORTED_ENCODINGS:
+        Args:
+            encoding: Encoding name or alias
+            
+        Returns:
+            Canonical codec name (e.g. "iso8859-1" for "latin-1")
+            
+        Raises:
+            ValueError: If encoding is unknown or not supported
+        """
+        try:
+            canonical = codecs.lookup(encoding).name
+        except LookupError:
+            canonical = None
+        
+        if canonical not in self._SUPPORTED_CANONICAL:
             raise ValueError(f"Unsupported encoding: {encoding}. "
-                           f"Supported encodings: {', '.join(self.SUPPORTED_ENCODINGS)}")
+                           f"Supported encodings: {', '.join(self._SUPPORTED_ENCODINGS_SORTED)}")
+        return canonical
+    
+    def _is_transcodable(self, source_encoding: str) -> bool:
+        """
+        Check whether a detected source encoding can be streamed from.
         
-        # Generate output path if not provided
-        if output_path is None:
-            input_file = Path(input_path)
-            output_path = str(input_file.parent / f"{input_file.stem}_{encoding}{input_file.suffix}")
+        Args:
+            source_encoding: Detected encoding of the input file
+            
+        Returns:
+            True if the encoding is a supported encoding, a superset of one
+            or a BOM variant
+        """
+        try:
+            return codecs.lookup(source_encoding).name in self._TRANSCODABLE_CANONICAL
+        except LookupError:
+            return False
+    
+    def _can_copy_bytes(self, source_encoding: str, encoding: str) -> bool:
+        """
+        Check whether a file in one encoding is byte-identical when encoded in another.
+        
+        Encodings detected from a byte order mark (utf-8-sig, utf-16-le, ...)
+        never match a target encoding here, so files with a BOM are always
+        transcoded and have the BOM stripped.
+        
+        Args:
+            source_encoding: Detected encoding of the input file
+            encoding: Target encoding
+            
+        Returns:
+            True if the input bytes can be copied unchanged to the output
+        """
+        try:
+            source_name = codecs.lookup(source_encoding).name
+            target_name = codecs.lookup(encoding).name
+        except LookupError:
+            return False
         
-        # Read the file with automatic encoding detection
-        content = self._read_file_with_fallback(input_path)
+        if source_name == target_name:
+            return True
         
-        # Write the file with the target encoding
-        with open(output_path, 'w', encoding=encoding) as f:
+        # Pure ASCII input is unchanged by any ASCII-compatible target encoding
+        return source_name == 'ascii' and not target_name.startswith(('utf-16', 'utf-32'))
+    
+    def _copy_bytes(self, fd: int, size: int, output_path: str) -> None:
+        """
+        Copy a file's bytes unchanged to the output path.
+        
+        Uses os.sendfile where available so the copy stays in the kernel,
+        falling back to a buffered copy.
+        
+        Args:
+            fd: Open file descriptor of the input file
+            size: Size of the input file in bytes
+            output_path: Path to the output file
+        """
+        with open(output_path, 'wb') as fo:
+            if hasattr(os, 'sendfile'):
+                try:
+                    offset = 0
+                    while offset < size:
+                        sent = os.sendfile(fo.fileno(), fd, offset, size - offset)
+                        if sent == 0:
+                            break
+                        offset += sent
+                    return
+                except OSError:
+                    # Some platforms only support sendfile to sockets
+                    fo.seek(0)
+                    fo.truncate()
+            
+            os.lseek(fd, 0, os.SEEK_SET)
+            with open(fd, 'rb', closefd=False) as fi:
+                shutil.copyfileobj(fi, fo, _IO_BUFFER_SIZE)
+    
+    def _encode_in_memory(self, fd: int, stat: os.stat_result, input_path: str,
+                          output_path: str, encoding: str,
+                          source_encoding: Optional[str] = None) -> None:
+        """
+        Read a whole file into memory and write it with the target encoding.
+        
+        Args:
+            fd: Open file descriptor of the input file
+            stat: Stat result of the input file
+            input_path: Path to the input file
+            output_path: Path to the output file
+            encoding: Target encoding
+            source_encoding: Detected encoding of the input file, tried before
+                the fallback encodings if it is one encode_file streams from
+        """
+        # The mapping is released before the output is opened, which may
+        # truncate the input when encoding in place
+        with self._map_file(fd, stat.st_size) as raw:
+            content = None
+            if source_encoding is not None and self._is_transcodable(source_encoding):
+                try:
+                    content = str(raw, source_encoding)
+                except (LookupError, UnicodeDecodeError):
+                    pass
+                else:
+                    if self._bom_length(raw[:4], source_encoding):
+                        content = content[1:]
+            if content is None:
+                content = self._decode_with_fallback(raw, self._cache_key(input_path, stat))
+        
+        with open(output_path, 'w', encoding=encoding,
+                  buffering=_IO_BUFFER_SIZE, newline='') as f:
             f.write(content)
+    
+    def _transcode(self, fd: int, output_path: str,
+                   source_encoding: str, encoding: str) -> None:
+        """
+        Stream a file from one encoding to another in fixed-size chunks.
         
-        return output_path
+        Args:
+            fd: Open file descriptor of the input file
+            output_path: Path to the output file
+            source_encoding: Encoding of the input file
+            encoding: Target encoding
+            
+        Raises:
+            LookupError: If either encoding is unknown
+            UnicodeDecodeError: If the input cannot be decoded as source_encoding
+            UnicodeEncodeError: If the content cannot be encoded as encoding
+        """
+        # Incremental codecs work directly on raw byte chunks, handing each
+        # chunk to CPython's C codec loops without the StreamReader/StreamWriter
+        # buffering layered on top
+        decoder = codecs.getincrementaldecoder(source_encoding)()
+        encoder = codecs.getincrementalencoder(encoding)()
+        
+        os.lseek(fd, 0, os.SEEK_SET)
+        with open(fd, 'rb', buffering=_IO_BUFFER_SIZE, closefd=False) as fi, \
+                open(output_path, 'wb', buffering=_IO_BUFFER_SIZE) as fo:
+            # Skip a byte order mark so it is not carried into the output
+            fi.seek(self._bom_length(fi.read(4), source_encoding))
+            
+            # The buffered reader returns full-size chunks until EOF, so each
+            # codec call converts a long run of text rather than a line or
+            # a word at a time. Whatever the decoder still holds (a split
+            # multi-byte sequence) is flushed with the final call.
+            while True:
+                chunk = fi.read(_TRANSCODE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    fo.write(encoder.encode(text))
+            fo.write(encoder.encode(decoder.decode(b'', final=True), final=True))
     
     def _read_file_with_fallback(self, file_path: str) -> str:
         """
@@ -71,20 +437,54 @@ class FileEncoder:
         Raises:
             UnicodeDecodeError: If file cannot be decoded with any encoding
         """
-        # Common encodings to try in order
-        # Note: utf-16 variants to handle BOM issues
-        encodings_to_try = ['utf-8', 'utf-16-le', 'utf-16-be', 'utf-16', 'latin-1', 'cp1252', 'ascii']
+        fd, stat = self._open_for_read(file_path)
+        try:
+            with self._map_file(fd, stat.st_size) as raw:
+                return self._decode_with_fallback(raw, self._cache_key(file_path, stat))
+        finally:
+            os.close(fd)
+    
+    def _decode_with_fallback(self, raw: Union[mmap.mmap, bytes],
+                              cache_key: _CacheKey) -> str:
+        """
+        Decode a file's contents by trying fallback encodings in turn.
+        
+        Args:
+            raw: Contents of the file
+            cache_key: Key under which to record the encoding that worked
+            
+        Returns:
+            Content of the file as a string
+            
+        Raises:
+            UnicodeDecodeError: If the contents cannot be decoded with any encoding
+        """
+        # Pure ASCII is valid UTF-8; a single native regex scan confirms
+        # it without going through the codec machinery
+        if _NON_ASCII.search(raw) is None:
+            self._encoding_cache[cache_key] = 'ascii'
+            return str(raw, 'ascii')
+        
+        encodings_to_try = self._fallback_encodings(raw)
+        
+        # A byte order mark identifies the encoding without any trial decoding
+        bom_encoding = self._detect_bom(raw[:4])
+        if bom_encoding is not None:
+            encodings_to_try = [bom_encoding] + encodings_to_try
         
         for encoding in encodings_to_try:
             try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                    # Remove BOM character if present (common in UTF-16 and UTF-8 files)
-                    if content.startswith('\ufeff'):
-                        content = content[1:]
-                    return content
+                content = str(raw, encoding)
             except (UnicodeDecodeError, UnicodeError):
                 continue
+            # Record the encoding that worked so get_file_encoding can reuse it
+            self._encoding_cache[cache_key] = encoding
+            # Remove BOM character if present (common in UTF-16 and UTF-8 files).
+            # The utf-8-sig codec has already dropped its own BOM, so a U+FEFF
+            # left at the start is part of the text.
+            if encoding != 'utf-8-sig' and content.startswith('\ufeff'):
+                content = content[1:]
+            return content
         
         # If all encodings fail, raise an error
         raise UnicodeDecodeError(
@@ -93,24 +493,289 @@ class FileEncoder:
             ", ".join(encodings_to_try)
         )
     
-    def get_file_encoding(self, file_path: str) -> str:
+    def _fallback_encodings(self, raw: Union[mmap.mmap, bytes],
+                            include_utf8: bool = True) -> List[str]:
+        """
+        List the encodings to try, in order, when decoding by trial.
+        
+        Args:
+            raw: Contents of the file
+            include_utf8: Whether to start with utf-8
+            
+        Returns:
+            Candidate encoding names. The last one, latin-1, decodes any input.
+        """
+        encodings = ['utf-8'] if include_utf8 else []
+        # UTF-16 without a BOM is the least likely candidate. Its text contains
+        # NUL bytes, which single-byte text does not, so the UTF-16 variants are
+        # only tried when one is present. Otherwise nearly any even-length
+        # input would decode as UTF-16 and come out as mojibake.
+        if raw.find(b'\x00') >= 0:
+            encodings += ['utf-16-le', 'utf-16-be']
+        encodings += ['cp1252', 'latin-1']
+        return encodings
+    
+    @contextmanager
+    def _map_file(self, fd: int, size: int) -> Iterator[Union[mmap.mmap, bytes]]:
+        """
+        Memory-map an open file read-only.
+        
+        Args:
+            fd: Open file descriptor of the file
+            size: Size of the file in bytes
+            
+        Yields:
+            A read-only map of the file, or empty bytes for an empty file
+            (which cannot be mapped)
+        """
+        if size == 0:
+            yield b''
+            return
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+    
+    def _bom_length(self, head: bytes, source_encoding: str) -> int:
+        """
+        Get the length of a byte order mark that decoding will not remove.
+        
+        Args:
+            head: The first (up to four) bytes of the file
+            source_encoding: Encoding the file will be decoded with
+            
+        Returns:
+            Number of leading bytes to skip, or 0 if there is no BOM to skip
+        """
+        # The utf-8-sig codec drops the BOM itself; skipping it as well would
+        # also drop a U+FEFF that belongs to the text
+        if source_encoding == 'utf-8-sig':
+            return 0
+        for bom, bom_encoding in _BOMS:
+            if bom_encoding == source_encoding and head.startswith(bom):
+                return len(bom)
+        return 0
+    
+    def _detect_bom(self, head: bytes) -> Optional[str]:
+        """
+        Identify an encoding from a byte order mark at the start of a file.
+        
+        Args:
+            head: The first (up to four) bytes of the file
+            
+        Returns:
+            Encoding indicated by the BOM, or None if no BOM is present
+        """
+        for bom, encoding in _BOMS:
+            if head.startswith(bom):
+                return encoding
+        return None
+    
+    def _run_detector(self, raw: Union[mmap.mmap, bytes], limit: int) -> Optional[str]:
+        """
+        Feed up to limit bytes of a file to a chardet-style detector.
+        
+        The Cython-based cchardet is preferred when installed, falling back
+        to the pure-Python chardet. Feeding stops early once the detector
+        is confident.
+        
+        Args:
+            raw: Contents of the file
+            limit: Maximum number of bytes to feed
+            
+        Returns:
+            Detected encoding name, or None if neither detector is available
+            or no encoding could be determined with reasonable confidence
+        """
+        detector_module = _get_cchardet()
+        min_confidence = _CCHARDET_MIN_CONFIDENCE
+        if not detector_module:
+            detector_module = _get_chardet()
+            min_confidence = _CHARDET_MIN_CONFIDENCE
+        if not detector_module:
+            return None
+        
+        detector = detector_module.UniversalDetector()
+        for start in range(0, min(len(raw), limit), _DETECT_CHUNK_SIZE):
+            detector.feed(raw[start:start + min(_DETECT_CHUNK_SIZE, limit - start)])
+            if detector.done:
+                break
+        detector.close()
+        
+        encoding = detector.result['encoding']
+        confidence = detector.result['confidence'] or 0
+        # The file is known not to be pure ASCII by the time a detector runs,
+        # so an ASCII verdict is not trusted either
+        if not encoding or confidence < min_confidence or encoding.lower() == 'ascii':
+            return None
+        return encoding.lower()
+    
+    def get_file_encoding(self, file_path: str, deep: bool = False) -> str:
         """
         Detect the encoding of a file.
         
+        Detection checks for a byte order mark, pure ASCII and valid UTF-8,
+        then uses cchardet or chardet (when installed) on a sample of at most
+        64KB and, if deep is set and the sample is inconclusive, on the whole
+        file, and finally falls back to trial decoding. Results are cached per
+        path and file identity, including the encoding encode_file
+        actually used to read the file.
+        
         Args:
             file_path: Path to the file
+            deep: Whether to run the detector over the whole file when the
+                sample is inconclusive (unbounded cost on large files)
             
         Returns:
             Detected encoding name
         """
-        encodings_to_try = ['utf-8', 'utf-16-le', 'utf-16-be', 'utf-16', 'latin-1', 'cp1252', 'ascii']
+        fd, stat = self._open_for_read(file_path)
+        try:
+            return self._get_cached_encoding(file_path, fd, stat, deep)
+        finally:
+            os.close(fd)
+    
+    def _get_cached_encoding(self, file_path: str, fd: int, stat: os.stat_result,
+                             deep: bool = False) -> str:
+        """
+        Detect the encoding of an open file, consulting the cache first.
+        
+        Args:
+            file_path: Path to the file
+            fd: Open file descriptor of the file
+            stat: Stat result of the file
+            deep: Whether to run full-file detection if the sample is inconclusive
+            
+        Returns:
+            Detected encoding name
+        """
+        cache_key = self._cache_key(file_path, stat, deep)
+        cached = self._encoding_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        with self._map_file(fd, stat.st_size) as raw:
+            encoding = self._detect_encoding(raw, deep)
+        self._encoding_cache[cache_key] = encoding
+        return encoding
+    
+    def _cache_key(self, file_path: str, stat: os.stat_result,
+                   deep: bool = False) -> _CacheKey:
+        """
+        Build the key under which a file's detected encoding is cached.
         
+        Size, inode and change time are included alongside the modification
+        time so a file that is replaced or rewritten with its modification
+        time preserved is not served a stale verdict.
+        
+        Args:
+            file_path: Path to the file
+            stat: Stat result of the file
+            deep: Whether the encoding comes from deep detection
+            
+        Returns:
+            Tuple of the path, size, inode, change and modification times in
+            nanoseconds, and deep
+        """
+        return (file_path, stat.st_size, stat.st_ino, stat.st_ctime_ns,
+                stat.st_mtime_ns, deep)
+    
+    def _detect_encoding(self, raw: Union[mmap.mmap, bytes], deep: bool = False) -> str:
+        """
+        Detect the encoding of a file's contents without consulting the cache.
+        
+        Tiers are tried from cheapest to most expensive and the first one
+        with an answer wins, so the cost of detection follows how hard the
+        input is rather than always paying for the worst case.
+        
+        Args:
+            raw: Contents of the file
+            deep: Whether to include the full-file detector tier
+            
+        Returns:
+            Detected encoding name
+        """
+        tiers = [
+            self._detect_tier1_bom,
+            self._detect_tier2_ascii,
+            self._detect_tier3_validate_utf8,
+            self._detect_tier4_chardet,
+        ]
+        if deep:
+            tiers.append(self._detect_tier5_chardet_full)
+        for tier in tiers:
+            encoding = tier(raw)
+            if encoding is not None:
+                return encoding
+        
+        # Without a confident detector verdict, fall back to trial decoding.
+        # UTF-8 and ASCII have already been ruled out by the earlier tiers.
+        encodings_to_try = self._fallback_encodings(raw, include_utf8=False)
         for encoding in encodings_to_try:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    f.read()
+            if self._validates_as(raw, encoding):
                 return encoding
-            except (UnicodeDecodeError, UnicodeError):
-                continue
         
         return "unknown"
+    
+    def _validates_as(self, raw: Union[mmap.mmap, bytes], encoding: str) -> bool:
+        """
+        Check whether a file's contents decode without error in an encoding.
+        
+        Args:
+            raw: Contents of the file
+            encoding: Encoding to validate against
+            
+        Returns:
+            True if the whole of raw decodes with the encoding
+        """
+        # Decode in chunks so validation doesn't hold a copy of the whole
+        # file; the C decoders stop at the first invalid sequence
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            for start in range(0, len(raw), _TRANSCODE_CHUNK_SIZE):
+                decoder.decode(raw[start:start + _TRANSCODE_CHUNK_SIZE])
+            decoder.decode(b'', final=True)
+        except (UnicodeDecodeError, UnicodeError):
+            return False
+        return True
+    
+    def _detect_tier1_bom(self, raw: Union[mmap.mmap, bytes]) -> Optional[str]:
+        """Detect the encoding from a byte order mark in the first four bytes."""
+        return self._detect_bom(raw[:4])
+    
+    def _detect_tier2_ascii(self, raw: Union[mmap.mmap, bytes]) -> Optional[str]:
+        """Detect pure ASCII content."""
+        # Scan the whole file for non-ASCII bytes rather than only a sample,
+        # since a sample that happens to be ASCII says nothing about the rest.
+        # The regex runs natively and stops at the first non-ASCII byte.
+        if _NON_ASCII.search(raw) is None:
+            return 'ascii'
+        return None
+    
+    def _detect_tier3_validate_utf8(self, raw: Union[mmap.mmap, bytes]) -> Optional[str]:
+        """Detect content that is entirely valid UTF-8."""
+        return 'utf-8' if self._validates_as(raw, 'utf-8') else None
+    
+    def _detect_tier4_chardet(self, raw: Union[mmap.mmap, bytes]) -> Optional[str]:
+        """Detect the encoding with chardet from a sample of at most 64KB."""
+        return self._run_detector(raw, _DETECT_SAMPLE_LIMIT)
+    
+    def _detect_tier5_chardet_full(self, raw: Union[mmap.mmap, bytes]) -> Optional[str]:
+        """Detect the encoding with chardet over the whole file."""
+        # Only worth running when the sample didn't already cover the file
+        if len(raw) <= _DETECT_SAMPLE_LIMIT:
+            return None
+        return self._run_detector(raw, len(raw))
+
+
+def _encode_one(encoder_cls: Type[FileEncoder], input_path: str, encoding: str) -> str:
+    """
+    Encode a single file in a worker process for FileEncoder.encode_files.
+    
+    Args:
+        encoder_cls: FileEncoder class (or subclass) to instantiate
+        input_path: Path to the input file
+        encoding: Target encoding
+        
+    Returns:
+        Path to the encoded output file
+    """
+    return encoder_cls().encode_file(input_path, encoding=encoding)
@@ -2,9 +2,11 @@
 
 import os
 import tempfile
+import pytest
 from click.testing import CliRunner
 
 from file_encoder.cli import main
+from file_encoder.command import main as command_main
 
 
 class TestCLI:
@@ -137,3 +139,54 @@ class TestCLI:
         
         assert result.exit_code == 0
         assert "File encoded successfully" in result.output
+
+
+class TestCommand:
+    """Test cases for the argparse command-line interface."""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.test_dir = tempfile.mkdtemp()
+        
+    def teardown_method(self):
+        """Clean up after each test method."""
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def create_test_file(self, content: str, filename: str = "test.txt", 
+                        encoding: str = "utf-8") -> str:
+        """Create a test file with the given content and encoding."""
+        file_path = os.path.join(self.test_dir, filename)
+        with open(file_path, 'w', encoding=encoding) as f:
+            f.write(content)
+        return file_path
+    
+    def test_command_basic_usage(self, capsys):
+        """Test basic command usage with verbose output."""
+        input_file = self.create_test_file("Hello, World!")
+        
+        exit_code = command_main([input_file, '--encoding', 'utf-16', '--verbose'])
+        
+        assert exit_code == 0
+        output = capsys.readouterr().out
+        assert "Original encoding detected" in output
+        assert "File encoded successfully" in output
+    
+    def test_command_nonexistent_file(self, capsys):
+        """Test command with a file that doesn't exist."""
+        nonexistent_file = os.path.join(self.test_dir, "nonexistent.txt")
+        
+        with pytest.raises(SystemExit) as exc_info:
+            command_main([nonexistent_file])
+        
+        assert exc_info.value.code == 2
+        assert "does not exist" in capsys.readouterr().err
+    
+    def test_command_unsupported_encoding(self, capsys):
+        """Test command with unsupported encoding."""
+        input_file = self.create_test_file("Hello, World!")
+        
+        exit_code = command_main([input_file, '--encoding', 'unsupported'])
+        
+        assert exit_code == 1
+        assert "Unsupported encoding" in capsys.readouterr().err
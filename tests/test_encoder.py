@@ -4,9 +4,41 @@ import os
 import tempfile
 import pytest
 
+from file_encoder import encoder as encoder_module
 from file_encoder.encoder import FileEncoder
 
 
+class FakeDetectorModule:
+    """Stand-in for the cchardet/chardet modules that returns a fixed verdict."""
+    
+    def __init__(self, encoding, confidence, min_bytes=0):
+        self.verdict = {'encoding': encoding, 'confidence': confidence}
+        # The verdict is only given once at least min_bytes have been fed
+        self.min_bytes = min_bytes
+        self.bytes_fed = []
+    
+    def UniversalDetector(self):
+        """Create a detector reporting back to this module."""
+        module = self
+        
+        class Detector:
+            done = False
+            
+            def __init__(self):
+                self.fed = 0
+                self.result = {'encoding': None, 'confidence': None}
+            
+            def feed(self, data):
+                self.fed += len(data)
+            
+            def close(self):
+                module.bytes_fed.append(self.fed)
+                if self.fed >= module.min_bytes:
+                    self.result = dict(module.verdict)
+        
+        return Detector()
+
+
 class TestFileEncoder:
     """Test cases for the FileEncoder class."""
     
@@ -82,6 +114,14 @@ class TestFileEncoder:
         with pytest.raises(FileNotFoundError):
             self.encoder.encode_file(nonexistent_file)
     
+    def test_encode_file_directory(self):
+        """Test encoding a directory instead of a file."""
+        with pytest.raises(IsADirectoryError):
+            self.encoder.encode_file(self.test_dir)
+        
+        with pytest.raises(IsADirectoryError):
+            self.encoder.get_file_encoding(self.test_dir)
+    
     def test_encode_file_unsupported_encoding(self):
         """Test encoding with an unsupported encoding."""
         content = "Hello, World!"
@@ -92,6 +132,17 @@ class TestFileEncoder:
         
         assert "Unsupported encoding" in str(exc_info.value)
     
+    def test_encode_file_encoding_alias(self):
+        """Test that encoding aliases resolve to a supported encoding."""
+        content = "Hello, World! Café"
+        input_file = self.create_test_file(content)
+        
+        output_file = self.encoder.encode_file(input_file, encoding="LATIN_1")
+        
+        with open(output_file, 'r', encoding='latin-1') as f:
+            result_content = f.read()
+        assert result_content == content
+    
     def test_encode_file_unicode_content(self):
         """Test encoding a file with Unicode content."""
         content = "Hello, 世界! 🌍 Café naïve résumé"
@@ -116,6 +167,114 @@ class TestFileEncoder:
             result_content = f.read()
         assert result_content == content
     
+    def test_encode_file_spanning_multiple_chunks(self):
+        """Test encoding content larger than a single transcoding chunk."""
+        content = "Café 世界 🌍 naïve\n" * 10000
+        input_file = self.create_test_file(content, "chunked.txt")
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-16")
+        
+        with open(output_file, 'r', encoding='utf-16', newline='') as f:
+            result_content = f.read()
+        assert result_content == content
+    
+    def test_encode_file_strips_bom(self):
+        """Test that a source byte order mark is not carried into the output."""
+        content = "Hello, World!"
+        input_file = self.create_test_file(content, "bom.txt", "utf-16")
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        
+        with open(output_file, 'rb') as f:
+            assert f.read() == content.encode('utf-8')
+    
+    def test_encode_file_in_place(self):
+        """Test encoding a file onto itself preserves its content."""
+        content = "Hello, World! Café"
+        input_file = self.create_test_file(content)
+        
+        result_path = self.encoder.encode_file(input_file, output_path=input_file,
+                                               encoding="utf-16")
+        
+        assert result_path == input_file
+        with open(input_file, 'r', encoding='utf-16') as f:
+            result_content = f.read()
+        assert result_content == content
+    
+    @pytest.mark.parametrize("source_encoding,verdict,content", [
+        ("big5", "Big5", "這是中文測試文件，包含繁體字。"),
+        ("shift_jis", "SHIFT_JIS", "これは日本語のテストファイルです。"),
+    ])
+    def test_encode_file_in_place_non_latin(self, monkeypatch, source_encoding,
+                                            verdict, content):
+        """Test encoding a non-Latin file onto itself uses the detected encoding."""
+        self.use_detectors(monkeypatch, cchardet=FakeDetectorModule(verdict, 0.99))
+        input_file = self.create_test_file(content, "cjk.txt", source_encoding)
+        
+        self.encoder.encode_file(input_file, output_path=input_file, encoding="utf-8")
+        
+        with open(input_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
+    
+    def test_encode_file_keeps_zero_width_no_break_space_after_utf8_bom(self):
+        """Test that only the UTF-8 BOM is removed, not a U+FEFF in the text."""
+        content = "\ufeffHi"
+        input_file = self.create_test_file(content, "bom.txt", "utf-8-sig")
+        
+        assert self.encoder._read_file_with_fallback(input_file) == content
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
+    
+    def test_encode_file_same_encoding_copies_bytes(self):
+        """Test that encoding to the file's own encoding leaves the bytes unchanged."""
+        content = "Hello, 世界!\r\nCafé naïve\r\n"
+        input_file = self.create_test_file(content)
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        
+        with open(input_file, 'rb') as f_in, open(output_file, 'rb') as f_out:
+            assert f_out.read() == f_in.read()
+    
+    def test_encode_files(self):
+        """Test encoding several files in parallel."""
+        contents = ["Hello, World!", "Café naïve", "Hello, 世界! 🌍"]
+        input_files = [self.create_test_file(content, f"batch{i}.txt")
+                       for i, content in enumerate(contents)]
+        
+        output_files = FileEncoder.encode_files(input_files, encoding="utf-16", workers=2)
+        
+        assert len(output_files) == len(contents)
+        for output_file, content in zip(output_files, contents):
+            with open(output_file, 'r', encoding='utf-16') as f:
+                assert f.read() == content
+    
+    def test_encode_file_ignores_unsupported_detector_verdict(self, monkeypatch):
+        """Test that a detected encoding outside the supported set is not trusted."""
+        fake = FakeDetectorModule('IBM852', 0.67)
+        monkeypatch.setattr(encoder_module, '_get_cchardet', lambda: fake)
+        content = "Hello, Café ñ"
+        input_file = self.create_test_file(content, "latin1.txt", "latin-1")
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        
+        assert fake.bytes_fed
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
+    
+    def test_encode_file_ignores_unsupported_detector_verdict_even_length(self, monkeypatch):
+        """Test the fallback for an even-length file is not mistaken for UTF-16."""
+        fake = FakeDetectorModule('IBM865', 0.7)
+        monkeypatch.setattr(encoder_module, '_get_cchardet', lambda: fake)
+        content = "Ångström über straße"
+        input_file = self.create_test_file(content, "latin1.txt", "latin-1")
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
+    
     def test_get_file_encoding(self):
         """Test detecting file encoding."""
         content = "Hello, World!"
@@ -131,6 +290,171 @@ class TestFileEncoder:
         detected_encoding = self.encoder.get_file_encoding(ascii_file)
         assert detected_encoding in ["utf-8", "ascii"]
     
+    def test_get_file_encoding_non_ascii_beyond_sample(self):
+        """Test that non-ASCII content after a long ASCII prefix is not reported as ASCII."""
+        content = "a" * (128 * 1024) + "Café"
+        input_file = self.create_test_file(content, "late.txt")
+        
+        assert self.encoder.get_file_encoding(input_file) != "ascii"
+        
+        output_file = self.encoder.encode_file(input_file, encoding="latin-1")
+        with open(output_file, 'r', encoding='latin-1') as f:
+            assert f.read() == content
+    
+    def test_get_file_encoding_valid_utf8(self):
+        """Test that non-ASCII content which is valid UTF-8 is detected as UTF-8."""
+        utf8_file = self.create_test_file("Hello, 世界! Café naïve", "utf8.txt", "utf-8")
+        
+        assert self.encoder.get_file_encoding(utf8_file) == "utf-8"
+    
+    def use_detectors(self, monkeypatch, cchardet=False, chardet=False):
+        """Replace the optional detector modules with the given fakes (False for missing)."""
+        monkeypatch.setattr(encoder_module, '_get_cchardet', lambda: cchardet)
+        monkeypatch.setattr(encoder_module, '_get_chardet', lambda: chardet)
+    
+    def test_encode_file_gb18030_verdict_for_gb2312(self, monkeypatch):
+        """Test that cchardet's GB18030 verdict for a GB2312 file is used."""
+        self.use_detectors(monkeypatch, cchardet=FakeDetectorModule('GB18030', 0.99))
+        content = "这是一个中文测试文件，包含简体字。"
+        input_file = self.create_test_file(content, "gb2312.txt", "gb2312")
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
+    
+    def test_encode_file_cp932_verdict_for_shift_jis(self, monkeypatch):
+        """Test that chardet's CP932 verdict for a Shift-JIS file is used."""
+        self.use_detectors(monkeypatch, chardet=FakeDetectorModule('CP932', 0.5))
+        content = "これは日本語のテストファイルです。"
+        input_file = self.create_test_file(content, "shift_jis.txt", "shift_jis")
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
+    
+    def test_get_file_encoding_utf16_without_bom_fallback(self, monkeypatch):
+        """Test that trial decoding validates a large BOM-less UTF-16 file in chunks."""
+        self.use_detectors(monkeypatch)
+        content = "Grüße aus Köln. " * 20000
+        input_file = self.create_test_file(content, "utf16.txt", "utf-16-le")
+        
+        assert self.encoder.get_file_encoding(input_file) == "utf-16-le"
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
+    
+    def test_encode_file_cp1252_low_confidence_chardet(self, monkeypatch):
+        """Test that a correct low-confidence chardet verdict is used."""
+        fake = FakeDetectorModule('Windows-1252', 0.08)
+        self.use_detectors(monkeypatch, chardet=fake)
+        content = "Le café est très bon, naïve résumé…"
+        input_file = self.create_test_file(content, "cp1252.txt", "cp1252")
+        
+        assert self.encoder.get_file_encoding(input_file) == "windows-1252"
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
+    
+    def test_encode_file_cp1252_without_detector(self, monkeypatch):
+        """Test that single-byte text is not decoded as BOM-less UTF-16."""
+        self.use_detectors(monkeypatch)
+        content = "naïve façade"
+        input_file = self.create_test_file(content, "cp1252.txt", "cp1252")
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-8")
+        
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
+    
+    def test_cchardet_preferred_over_chardet(self, monkeypatch):
+        """Test that a cchardet verdict is used ahead of chardet for detection and encoding."""
+        cchardet = FakeDetectorModule('ISO-8859-1', 0.9)
+        chardet = FakeDetectorModule('Windows-1252', 0.9)
+        self.use_detectors(monkeypatch, cchardet=cchardet, chardet=chardet)
+        content = "Hello, Café ñ"
+        input_file = self.create_test_file(content, "latin1.txt", "latin-1")
+        
+        assert self.encoder.get_file_encoding(input_file) == "iso-8859-1"
+        assert cchardet.bytes_fed == [len(content)]
+        assert chardet.bytes_fed == []
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-16")
+        with open(output_file, 'r', encoding='utf-16') as f:
+            assert f.read() == content
+    
+    def test_get_file_encoding_tier4_confidence_cutoff(self, monkeypatch):
+        """Test that low-confidence cchardet verdicts fall through to trial decoding."""
+        input_file = self.create_test_file("Hello, Café ñ", "latin1.txt", "latin-1")
+        
+        self.use_detectors(monkeypatch, cchardet=FakeDetectorModule('ISO-8859-1', 0.3))
+        assert FileEncoder().get_file_encoding(input_file) == "cp1252"
+        
+        self.use_detectors(monkeypatch, cchardet=FakeDetectorModule('ISO-8859-1', 0.9))
+        assert FileEncoder().get_file_encoding(input_file) == "iso-8859-1"
+    
+    def test_get_file_encoding_tier5_only_when_deep(self, monkeypatch):
+        """Test that full-file detection only runs when explicitly requested."""
+        content = "a" * (100 * 1024) + "Café"
+        input_file = self.create_test_file(content, "late.txt", "latin-1")
+        sample_limit = encoder_module._DETECT_SAMPLE_LIMIT
+        # The fake only reaches a verdict once it has seen more than the sample
+        fake = FakeDetectorModule('ISO-8859-1', 0.9, min_bytes=sample_limit + 1)
+        self.use_detectors(monkeypatch, cchardet=fake)
+        
+        assert self.encoder.get_file_encoding(input_file) == "cp1252"
+        self.encoder.encode_file(input_file, encoding="utf-8")
+        assert max(fake.bytes_fed) <= sample_limit
+        
+        assert self.encoder.get_file_encoding(input_file, deep=True) == "iso-8859-1"
+        assert max(fake.bytes_fed) == os.path.getsize(input_file)
+    
+    def test_get_file_encoding_bom(self):
+        """Test that a byte order mark determines the detected encoding."""
+        content = "Hello, World!"
+        
+        bom_file = self.create_test_file(content, "bom.txt", "utf-8-sig")
+        assert self.encoder.get_file_encoding(bom_file) == "utf-8-sig"
+        assert self.encoder._read_file_with_fallback(bom_file) == content
+    
+    def test_get_file_encoding_cache_invalidated_on_change(self):
+        """Test that a modified file is re-detected rather than served from cache."""
+        bom_file = self.create_test_file("Hello, World!", "cached.txt", "utf-8-sig")
+        assert self.encoder.get_file_encoding(bom_file) == "utf-8-sig"
+        
+        self.create_test_file("Hello, World!", "cached.txt", "utf-8")
+        stat = os.stat(bom_file)
+        os.utime(bom_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert self.encoder.get_file_encoding(bom_file) in ["utf-8", "ascii"]
+    
+    def test_get_file_encoding_cache_invalidated_with_mtime_preserved(self):
+        """Test that a rewritten file is re-detected even if its mtime is restored."""
+        input_file = self.create_test_file("Hello, Café", "cached.txt", "latin-1")
+        stat = os.stat(input_file)
+        assert self.encoder.get_file_encoding(input_file) != "utf-8"
+        
+        content = "Hello, Café, déjà vu"
+        self.create_test_file(content, "cached.txt", "utf-8")
+        os.utime(input_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert self.encoder.get_file_encoding(input_file) == "utf-8"
+        
+        output_file = self.encoder.encode_file(input_file, encoding="utf-16")
+        with open(output_file, 'r', encoding='utf-16') as f:
+            assert f.read() == content
+    
+    def test_get_file_encoding_reuses_read_result(self):
+        """Test that the encoding used by a fallback read is reported afterwards."""
+        content = "Hello, Café"
+        input_file = self.create_test_file(content, "latin1.txt", "latin-1")
+        
+        self.encoder._read_file_with_fallback(input_file)
+        
+        # cp1252 is tried before latin-1 and decodes this content identically
+        assert self.encoder.get_file_encoding(input_file) == "cp1252"
+    
     def test_supported_encodings_list(self):
         """Test that the supported encodings list is not empty."""
         assert len(FileEncoder.SUPPORTED_ENCODINGS) > 0
@@ -149,6 +473,14 @@ class TestFileEncoder:
         result_content = self.encoder._read_file_with_fallback(input_file)
         assert result_content == content
     
+    def test_read_file_with_fallback_non_utf8(self):
+        """Test reading a file that is not valid UTF-8 falls back correctly."""
+        content = "Hello, Café"
+        input_file = self.create_test_file(content, "latin1.txt", "latin-1")
+        
+        result_content = self.encoder._read_file_with_fallback(input_file)
+        assert result_content == content
+    
     def test_output_filename_generation(self):
         """Test that output filenames are generated correctly."""
         content = "Hello, World!"